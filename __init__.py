@@ -4,22 +4,27 @@ import logging
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, CONF_PORT, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import device_registry as dr
 
 from .const import (
     CONF_DEVICES,
     CONF_ENABLE_POLLING,
     CONF_POLLING_INTERVAL,
-    DATA_COORDINATOR,
+    CONF_POLLING_INTERVAL_MAX,
     DEFAULT_POLLING_INTERVAL,
+    DEFAULT_POLLING_INTERVAL_MAX,
+    DEVICE_MANUFACTURER,
+    DEVICE_MODEL,
+    DEVICE_NAME,
+    DEVICE_SW_VERSION,
     DOMAIN,
 )
 from .coordinator import CurtainTCPCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS: list[Platform] = [Platform.COVER]
+PLATFORMS: tuple[Platform, ...] = (Platform.COVER,)
 
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
@@ -28,7 +33,6 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
 
     # Initialize data storage
     hass.data.setdefault(DOMAIN, {})
-    hass.data.setdefault(DATA_COORDINATOR, {})
 
     return True
 
@@ -40,11 +44,16 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     host = entry.data[CONF_HOST]
     port = entry.data[CONF_PORT]
     devices = entry.data.get(CONF_DEVICES, [])
-    enable_polling = entry.data.get(CONF_ENABLE_POLLING, False)
-    polling_interval = entry.data.get(CONF_POLLING_INTERVAL, DEFAULT_POLLING_INTERVAL)
+    enable_polling, polling_interval, max_polling_interval = _get_polling_settings(entry)
+
+    # Entries created before unique IDs were used are matched by host:port
+    if entry.unique_id is None:
+        hass.config_entries.async_update_entry(entry, unique_id=f"{host}:{port}")
 
     # Create coordinator
-    coordinator = CurtainTCPCoordinator(hass, host, port, enable_polling, polling_interval)
+    coordinator = CurtainTCPCoordinator(
+        hass, host, port, enable_polling, polling_interval, max_polling_interval
+    )
 
     # Setup coordinator
     if not await coordinator.async_setup():
@@ -52,44 +61,76 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         return False
 
     # Store coordinator
-    hass.data[DATA_COORDINATOR][entry.entry_id] = coordinator
+    entry.runtime_data = coordinator
 
-    # Register device in device registry
-    device_registry = dr.async_get(hass)
-    device_registry.async_get_or_create(
-        config_entry_id=entry.entry_id,
-        identifiers={(DOMAIN, f"{host}_{port}")},
-        name="Duya窗帘控制器",
-        manufacturer="Duya",
-        model="智能窗帘控制器",
-        sw_version="1.0",
-        connections={("tcp", f"{host}:{port}")},
-    )
+    # Apply config entry updates (e.g. devices added through options)
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
-    polling_status = f" (轮询: {'启用' if enable_polling else '禁用'}"
-    if enable_polling:
-        polling_status += f", 间隔: {polling_interval}秒"
-    polling_status += ")"
-    
-    _LOGGER.info("✅ Coordinator created for %s:%d with %d devices%s",
-                host, port, len(devices), polling_status)
+    if _LOGGER.isEnabledFor(logging.INFO):
+        polling_status = f" (轮询: {'启用' if enable_polling else '禁用'}"
+        if enable_polling:
+            polling_status += f", 间隔: {polling_interval}-{max_polling_interval}秒"
+        polling_status += ")"
+
+        _LOGGER.info("Coordinator created for %s:%d with %d devices%s",
+                     host, port, len(devices), polling_status)
 
     # Setup platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    # Register device in device registry
+    _async_register_device(hass, entry, host, port)
+
     # Log device information
-    if devices:
+    if not devices:
+        _LOGGER.info("No devices configured - add devices through integration options")
+    elif _LOGGER.isEnabledFor(logging.INFO):
         device_info = ", ".join([
             f"{d['name']}(0x{d['device_address']:04X})"
             for d in devices
         ])
         _LOGGER.info("Configured devices: %s", device_info)
-    else:
-        _LOGGER.info("No devices configured - add devices through integration options")
 
     return True
 
 
+def _get_polling_settings(entry: ConfigEntry) -> tuple[bool, int, int]:
+    """Return (enable_polling, polling_interval, max_polling_interval) for an entry."""
+    enable_polling = entry.data.get(CONF_ENABLE_POLLING, False)
+    polling_interval = entry.data.get(CONF_POLLING_INTERVAL, DEFAULT_POLLING_INTERVAL)
+    max_polling_interval = max(
+        entry.data.get(CONF_POLLING_INTERVAL_MAX, DEFAULT_POLLING_INTERVAL_MAX), polling_interval
+    )
+    return enable_polling, polling_interval, max_polling_interval
+
+
+@callback
+def _async_register_device(hass: HomeAssistant, entry: ConfigEntry, host: str, port: int) -> None:
+    """Register the controller device, skipping the registry write if it is unchanged."""
+    device_registry = dr.async_get(hass)
+    identifiers = {(DOMAIN, f"{host}_{port}")}
+
+    device = device_registry.async_get_device(identifiers=identifiers)
+    if (
+        device is not None
+        and entry.entry_id in device.config_entries
+        and device.name == DEVICE_NAME
+        and device.manufacturer == DEVICE_MANUFACTURER
+        and device.model == DEVICE_MODEL
+        and device.sw_version == DEVICE_SW_VERSION
+    ):
+        return
+
+    device_registry.async_get_or_create(
+        config_entry_id=entry.entry_id,
+        identifiers=identifiers,
+        name=DEVICE_NAME,
+        manufacturer=DEVICE_MANUFACTURER,
+        model=DEVICE_MODEL,
+        sw_version=DEVICE_SW_VERSION,
+    )
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     _LOGGER.info("Unloading curtain control config entry: %s", entry.title)
@@ -97,18 +138,29 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Unload platforms
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
-    # Shutdown and remove coordinator
-    coordinator = hass.data[DATA_COORDINATOR].get(entry.entry_id)
-    if coordinator:
-        await coordinator.async_shutdown()
-        del hass.data[DATA_COORDINATOR][entry.entry_id]
-        _LOGGER.info("Coordinator shutdown completed")
+    # Shutdown coordinator
+    coordinator: CurtainTCPCoordinator = entry.runtime_data
+    await coordinator.async_shutdown()
+    _LOGGER.info("Coordinator shutdown completed")
 
     return unload_ok
 
 
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Reload config entry."""
+    coordinator: CurtainTCPCoordinator | None = getattr(entry, "runtime_data", None)
+    configured_addresses = {d["device_address"] for d in entry.data.get(CONF_DEVICES, [])}
+
+    # Only polling settings changed: update the running coordinator in place
+    if (
+        coordinator is not None
+        and coordinator.host == entry.data[CONF_HOST]
+        and coordinator.port == entry.data[CONF_PORT]
+        and coordinator.registered_devices == configured_addresses
+    ):
+        _LOGGER.info("Updating polling settings for config entry: %s", entry.title)
+        await coordinator.async_update_polling(*_get_polling_settings(entry))
+        return
+
     _LOGGER.info("Reloading curtain control config entry: %s", entry.title)
-    await async_unload_entry(hass, entry)
-    await async_setup_entry(hass, entry)
+    await hass.config_entries.async_reload(entry.entry_id)
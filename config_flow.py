@@ -1,5 +1,7 @@
 """Config flow for Curtain Control integration."""
 
+import asyncio
+import contextlib
 import logging
 from typing import Any
 
@@ -7,7 +9,7 @@ import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_HOST, CONF_PORT
-from homeassistant.core import callback
+from homeassistant.core import HomeAssistant, callback
 import homeassistant.helpers.config_validation as cv
 
 from .const import (
@@ -16,9 +18,11 @@ from .const import (
     CONF_DISCOVERY_TIMEOUT,
     CONF_ENABLE_POLLING,
     CONF_POLLING_INTERVAL,
+    CONF_POLLING_INTERVAL_MAX,
     CONF_USE_DEVICE_MAPPING,
     DEFAULT_DISCOVERY_TIMEOUT,
     DEFAULT_POLLING_INTERVAL,
+    DEFAULT_POLLING_INTERVAL_MAX,
     DEFAULT_PORT,
     DOMAIN,
     ERROR_CANNOT_CONNECT,
@@ -31,17 +35,90 @@ from .device_discovery import DeviceDiscovery, DiscoveredDevice
 
 _LOGGER = logging.getLogger(__name__)
 
-
-@callback
-def configured_instances(hass):
-    """Return a set of configured instances."""
+_USER_SCHEMA = vol.Schema({
+    vol.Required(CONF_HOST): cv.string,
+    vol.Optional(CONF_PORT, default=DEFAULT_PORT): cv.port,
+})
+
+_DISCOVERY_SCHEMA = vol.Schema({
+    vol.Optional(CONF_AUTO_DISCOVERY, default=True): cv.boolean,
+    vol.Optional(CONF_USE_DEVICE_MAPPING, default=True): cv.boolean,
+    vol.Optional(CONF_ENABLE_POLLING, default=False): cv.boolean,
+    vol.Optional(CONF_POLLING_INTERVAL, default=DEFAULT_POLLING_INTERVAL): vol.All(
+        cv.positive_int, vol.Range(min=2, max=60)
+    ),
+    vol.Optional(CONF_POLLING_INTERVAL_MAX, default=DEFAULT_POLLING_INTERVAL_MAX): vol.All(
+        cv.positive_int, vol.Range(min=2, max=600)
+    ),
+    vol.Optional(CONF_DISCOVERY_TIMEOUT, default=DEFAULT_DISCOVERY_TIMEOUT): vol.All(
+        cv.positive_int, vol.Range(min=10, max=120)
+    ),
+})
+
+_INIT_ACTION_SCHEMA = vol.Schema({
+    vol.Required("action"): vol.In({
+        "rediscover": "重新发现设备",
+        "manage_devices": "管理现有设备",
+    }),
+})
+
+_REDISCOVER_SCHEMA = vol.Schema({
+    vol.Optional("timeout", default=DEFAULT_DISCOVERY_TIMEOUT): vol.All(
+        cv.positive_int, vol.Range(min=10, max=120)
+    ),
+})
+
+
+def _build_device_options(devices: list[DiscoveredDevice]) -> dict[str, str]:
+    """Build multi-select options (hex address -> label) for discovered devices."""
     return {
-        f"{entry.data[CONF_HOST]}:{entry.data[CONF_PORT]}"
-        for entry in hass.config_entries.async_entries(DOMAIN)
+        f"{device.address:04X}": f"{device.name} (0x{device.address:04X}) - 位置: {device.last_position}%"
+        for device in devices
     }
 
 
-class CurtainControlConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
+class _DiscoveryFlowMixin:
+    """Device discovery shared by the config flow and the options flow."""
+
+    hass: HomeAssistant
+    _coordinator: CurtainTCPCoordinator | None
+    _discovery: DeviceDiscovery | None
+    _discovered_devices: list[DiscoveredDevice]
+    _devices_by_address: dict[int, DiscoveredDevice]
+
+    async def _async_run_discovery(
+        self, host: str, port: int, use_device_mapping: bool, timeout: int
+    ) -> list[DiscoveredDevice]:
+        """Listen for devices on the bus, always releasing the connection afterwards."""
+        try:
+            # Reuse an already open connection if the flow has one
+            if self._coordinator is None:
+                self._coordinator = CurtainTCPCoordinator(self.hass, host, port)
+            await self._coordinator.async_setup()
+
+            # Create discovery service with mapping setting
+            self._discovery = DeviceDiscovery(self._coordinator, use_device_mapping)
+
+            # Scan for devices until the timeout cancels the scan
+            _LOGGER.info("Starting device discovery for %d seconds...", timeout)
+            with contextlib.suppress(TimeoutError):
+                async with asyncio.timeout(timeout):
+                    await self._discovery.scan_for_devices()
+            self._discovered_devices = self._discovery.discovered_devices
+        finally:
+            await self._async_shutdown_coordinator()
+
+        self._devices_by_address = {d.address: d for d in self._discovered_devices}
+        return self._discovered_devices
+
+    async def _async_shutdown_coordinator(self) -> None:
+        """Shut down the coordinator used by this flow, if any."""
+        if self._coordinator:
+            coordinator, self._coordinator = self._coordinator, None
+            await coordinator.async_shutdown()
+
+
+class CurtainControlConfigFlow(_DiscoveryFlowMixin, config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Curtain Control."""
 
     VERSION = 1
@@ -51,9 +128,18 @@ class CurtainControlConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         """Initialize config flow."""
         self._host: str = ""
         self._port: int = DEFAULT_PORT
+        self._use_device_mapping: bool = True
+        self._enable_polling: bool = False
+        self._polling_interval: int = DEFAULT_POLLING_INTERVAL
+        self._max_polling_interval: int = DEFAULT_POLLING_INTERVAL_MAX
         self._coordinator: CurtainTCPCoordinator = None
         self._discovery: DeviceDiscovery = None
         self._discovered_devices: list[DiscoveredDevice] = []
+        self._devices_by_address: dict[int, DiscoveredDevice] = {}
+        self._device_options: dict[str, str] = {}
+        self._discovery_task: asyncio.Task | None = None
+        self._discovery_timeout: int = DEFAULT_DISCOVERY_TIMEOUT
+        self._discovery_errors: dict[str, str] = {}
 
     async def async_step_user(self, user_input: dict[str, Any] | None = None):
         """Handle the initial step."""
@@ -62,39 +148,35 @@ class CurtainControlConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         if user_input is not None:
             host = user_input[CONF_HOST]
             port = user_input[CONF_PORT]
-            instance_key = f"{host}:{port}"
-
-            if instance_key in configured_instances(self.hass):
-                errors["base"] = "already_configured"
-            else:
-                # Test connection
-                try:
-                    coordinator = CurtainTCPCoordinator(self.hass, host, port)
+            await self.async_set_unique_id(f"{host}:{port}")
+            self._abort_if_unique_id_configured()
+            # Legacy entries only get a unique_id once set up, so match on data too
+            self._async_abort_entries_match({CONF_HOST: host, CONF_PORT: port})
 
-                    # Try to establish connection
-                    if await coordinator.test_connection():
-                        await coordinator.disconnect()
+            # Test connection
+            try:
+                coordinator = CurtainTCPCoordinator(self.hass, host, port)
 
-                        # Store connection info
-                        self._host = host
-                        self._port = port
+                # Try to establish connection
+                if await coordinator.test_connection():
+                    # Keep the connection open for the discovery step
+                    self._coordinator = coordinator
 
-                        # Proceed to discovery
-                        return await self.async_step_discovery()
-                    errors["base"] = ERROR_CANNOT_CONNECT
+                    # Store connection info
+                    self._host = host
+                    self._port = port
 
-                except (OSError, ConnectionError) as e:
-                    _LOGGER.error("Error testing connection: %s", e)
-                    errors["base"] = ERROR_CANNOT_CONNECT
+                    # Proceed to discovery
+                    return await self.async_step_discovery()
+                errors["base"] = ERROR_CANNOT_CONNECT
 
-        data_schema = vol.Schema({
-            vol.Required(CONF_HOST): cv.string,
-            vol.Optional(CONF_PORT, default=DEFAULT_PORT): cv.port,
-        })
+            except (OSError, ConnectionError) as e:
+                _LOGGER.error("Error testing connection: %s", e)
+                errors["base"] = ERROR_CANNOT_CONNECT
 
         return self.async_show_form(
             step_id="user",
-            data_schema=data_schema,
+            data_schema=_USER_SCHEMA,
             errors=errors,
             description_placeholders={
                 "default_port": str(DEFAULT_PORT)
@@ -103,7 +185,24 @@ class CurtainControlConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     async def async_step_discovery(self, user_input: dict[str, Any] | None = None):
         """Handle device discovery step."""
-        errors = {}
+        if self._discovery_task is not None:
+            # Flow re-shown mid-scan (e.g. frontend refresh): keep waiting
+            if not self._discovery_task.done():
+                return self._async_show_discovery_progress()
+
+            # Background scan finished, collect its result
+            task, self._discovery_task = self._discovery_task, None
+            try:
+                task.result()
+                self._device_options = _build_device_options(self._discovered_devices)
+            except (OSError, ConnectionError) as e:
+                _LOGGER.error("Error during device discovery: %s", e)
+                self._discovery_errors = {"base": ERROR_CANNOT_CONNECT}
+            else:
+                if self._discovered_devices:
+                    return self.async_show_progress_done(next_step_id=STEP_DEVICE_SELECTION)
+                self._discovery_errors = {"base": ERROR_NO_DEVICES_FOUND}
+            return self.async_show_progress_done(next_step_id=STEP_DISCOVERY)
 
         if user_input is not None:
             auto_discovery = user_input.get(CONF_AUTO_DISCOVERY, True)
@@ -111,66 +210,46 @@ class CurtainControlConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             use_device_mapping = user_input.get(CONF_USE_DEVICE_MAPPING, True)
             enable_polling = user_input.get(CONF_ENABLE_POLLING, False)
             polling_interval = user_input.get(CONF_POLLING_INTERVAL, DEFAULT_POLLING_INTERVAL)
+            max_polling_interval = user_input.get(CONF_POLLING_INTERVAL_MAX, DEFAULT_POLLING_INTERVAL_MAX)
 
             # Store the mapping and polling settings for later use
             self._use_device_mapping = use_device_mapping
             self._enable_polling = enable_polling
             self._polling_interval = polling_interval
+            self._max_polling_interval = max_polling_interval
 
             if auto_discovery:
-                # Perform device discovery
-                try:
-                    # Create coordinator for discovery
-                    self._coordinator = CurtainTCPCoordinator(self.hass, self._host, self._port)
-                    await self._coordinator.async_setup()
-
-                    # Create discovery service with mapping setting
-                    self._discovery = DeviceDiscovery(self._coordinator, use_device_mapping)
-
-                    # Scan for devices
-                    _LOGGER.info("Starting device discovery for %d seconds...", discovery_timeout)
-                    self._discovered_devices = await self._discovery.scan_for_devices(discovery_timeout)
-
-                    await self._coordinator.async_shutdown()
-
-                    if self._discovered_devices:
-                        return await self.async_step_device_selection()
-                    errors["base"] = ERROR_NO_DEVICES_FOUND
-
-                except (OSError, ConnectionError) as e:
-                    _LOGGER.error("Error during device discovery: %s", e)
-                    errors["base"] = ERROR_CANNOT_CONNECT
-                    if self._coordinator:
-                        await self._coordinator.async_shutdown()
-            else:
-                # Skip discovery, create entry without devices
-                return self.async_create_entry(
-                    title=f"窗帘控制器 ({self._host}:{self._port})",
-                    data={
-                        CONF_HOST: self._host,
-                        CONF_PORT: self._port,
-                        CONF_DEVICES: [],
-                        CONF_USE_DEVICE_MAPPING: use_device_mapping,
-                        CONF_ENABLE_POLLING: enable_polling,
-                        CONF_POLLING_INTERVAL: polling_interval,
-                    }
+                # Scan in the background and show a progress dialog meanwhile
+                self._discovery_timeout = discovery_timeout
+                self._discovery_task = self.hass.async_create_task(
+                    self._async_run_discovery(
+                        self._host, self._port, use_device_mapping, discovery_timeout
+                    )
                 )
+                return self._async_show_discovery_progress()
 
-        data_schema = vol.Schema({
-            vol.Optional(CONF_AUTO_DISCOVERY, default=True): cv.boolean,
-            vol.Optional(CONF_USE_DEVICE_MAPPING, default=True): cv.boolean,
-            vol.Optional(CONF_ENABLE_POLLING, default=False): cv.boolean,
-            vol.Optional(CONF_POLLING_INTERVAL, default=DEFAULT_POLLING_INTERVAL): vol.All(
-                cv.positive_int, vol.Range(min=2, max=60)
-            ),
-            vol.Optional(CONF_DISCOVERY_TIMEOUT, default=DEFAULT_DISCOVERY_TIMEOUT): vol.All(
-                cv.positive_int, vol.Range(min=10, max=120)
-            ),
-        })
+            await self._async_shutdown_coordinator()
+
+            # Skip discovery, create entry without devices
+            return self.async_create_entry(
+                title=f"窗帘控制器 ({self._host}:{self._port})",
+                data={
+                    CONF_HOST: self._host,
+                    CONF_PORT: self._port,
+                    CONF_DEVICES: [],
+                    CONF_USE_DEVICE_MAPPING: use_device_mapping,
+                    CONF_ENABLE_POLLING: enable_polling,
+                    CONF_POLLING_INTERVAL: polling_interval,
+                    CONF_POLLING_INTERVAL_MAX: max_polling_interval,
+                }
+            )
+
+        # Errors from a finished background scan are shown on the re-displayed form
+        errors, self._discovery_errors = self._discovery_errors, {}
 
         return self.async_show_form(
             step_id=STEP_DISCOVERY,
-            data_schema=data_schema,
+            data_schema=_DISCOVERY_SCHEMA,
             errors=errors,
             description_placeholders={
                 "host": self._host,
@@ -179,6 +258,20 @@ class CurtainControlConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             }
         )
 
+    @callback
+    def _async_show_discovery_progress(self):
+        """Show the progress dialog for the running discovery scan."""
+        return self.async_show_progress(
+            step_id=STEP_DISCOVERY,
+            progress_action=STEP_DISCOVERY,
+            progress_task=self._discovery_task,
+            description_placeholders={
+                "host": self._host,
+                "port": str(self._port),
+                "timeout": str(self._discovery_timeout),
+            },
+        )
+
     async def async_step_device_selection(self, user_input: dict[str, Any] | None = None):
         """Handle device selection step."""
         if user_input is not None:
@@ -198,10 +291,7 @@ class CurtainControlConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             devices = []
             for device_addr_str in selected_devices:
                 device_addr = int(device_addr_str, 16)
-                device = next(
-                    (d for d in self._discovered_devices if d.address == device_addr),
-                    None
-                )
+                device = self._devices_by_address.get(device_addr)
                 if device:
                     devices.append(self._discovery.create_device_config(device))
 
@@ -212,9 +302,10 @@ class CurtainControlConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     CONF_HOST: self._host,
                     CONF_PORT: self._port,
                     CONF_DEVICES: devices,
-                    CONF_USE_DEVICE_MAPPING: getattr(self, '_use_device_mapping', True),
-                    CONF_ENABLE_POLLING: getattr(self, '_enable_polling', False),
-                    CONF_POLLING_INTERVAL: getattr(self, '_polling_interval', DEFAULT_POLLING_INTERVAL),
+                    CONF_USE_DEVICE_MAPPING: self._use_device_mapping,
+                    CONF_ENABLE_POLLING: self._enable_polling,
+                    CONF_POLLING_INTERVAL: self._polling_interval,
+                    CONF_POLLING_INTERVAL_MAX: self._max_polling_interval,
                 }
             )
 
@@ -226,20 +317,21 @@ class CurtainControlConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             }
         )
 
+    @callback
+    def async_remove(self) -> None:
+        """Release the TCP connection when the flow is aborted or finished."""
+        if self._discovery_task is not None:
+            self._discovery_task.cancel()
+        elif self._coordinator:
+            self.hass.async_create_task(self._async_shutdown_coordinator())
+
     def _get_device_selection_schema(self):
         """Get device selection schema."""
-        if not self._discovered_devices:
+        if not self._device_options:
             return vol.Schema({})
 
-        # Create options for device selection
-        device_options = {}
-        for device in self._discovered_devices:
-            key = f"{device.address:04X}"
-            label = f"{device.name} (0x{device.address:04X}) - 位置: {device.last_position}%"
-            device_options[key] = label
-
         return vol.Schema({
-            vol.Optional("selected_devices", default=list(device_options.keys())): cv.multi_select(device_options),
+            vol.Optional("selected_devices", default=list(self._device_options)): cv.multi_select(self._device_options),
         })
 
     async def async_step_import(self, import_config: dict[str, Any]):
@@ -248,9 +340,9 @@ class CurtainControlConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         port = import_config.get(CONF_PORT, DEFAULT_PORT)
 
         # Check if already configured
-        instance_key = f"{host}:{port}"
-        if instance_key in configured_instances(self.hass):
-            return self.async_abort(reason="already_configured")
+        await self.async_set_unique_id(f"{host}:{port}")
+        self._abort_if_unique_id_configured()
+        self._async_abort_entries_match({CONF_HOST: host, CONF_PORT: port})
 
         # Create basic entry without discovery
         return self.async_create_entry(
@@ -269,7 +361,7 @@ class CurtainControlConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         return CurtainControlOptionsFlow(config_entry)
 
 
-class CurtainControlOptionsFlow(config_entries.OptionsFlow):
+class CurtainControlOptionsFlow(_DiscoveryFlowMixin, config_entries.OptionsFlow):
     """Handle options flow for Curtain Control."""
 
     def __init__(self, config_entry: config_entries.ConfigEntry):
@@ -278,6 +370,8 @@ class CurtainControlOptionsFlow(config_entries.OptionsFlow):
         self._coordinator: CurtainTCPCoordinator = None
         self._discovery: DeviceDiscovery = None
         self._discovered_devices: list[DiscoveredDevice] = []
+        self._devices_by_address: dict[int, DiscoveredDevice] = {}
+        self._device_options: dict[str, str] = {}
 
     async def async_step_init(self, user_input: dict[str, Any] | None = None):
         """Handle options flow start."""
@@ -289,16 +383,9 @@ class CurtainControlOptionsFlow(config_entries.OptionsFlow):
             if action == "manage_devices":
                 return await self.async_step_manage_devices()
 
-        schema = vol.Schema({
-            vol.Required("action"): vol.In({
-                "rediscover": "重新发现设备",
-                "manage_devices": "管理现有设备",
-            }),
-        })
-
         return self.async_show_form(
             step_id="init",
-            data_schema=schema,
+            data_schema=_INIT_ACTION_SCHEMA,
         )
 
     async def async_step_rediscover(self, user_input: dict[str, Any] | None = None):
@@ -307,53 +394,42 @@ class CurtainControlOptionsFlow(config_entries.OptionsFlow):
             timeout = user_input.get("timeout", DEFAULT_DISCOVERY_TIMEOUT)
 
             try:
-                host = self.config_entry.data[CONF_HOST]
-                port = self.config_entry.data[CONF_PORT]
-
-                # Create coordinator for discovery
-                self._coordinator = CurtainTCPCoordinator(self.hass, host, port)
-                await self._coordinator.async_setup()
-
-                # Create discovery service with mapping setting from config
-                use_device_mapping = self.config_entry.data.get(CONF_USE_DEVICE_MAPPING, True)
-                self._discovery = DeviceDiscovery(self._coordinator, use_device_mapping)
-
-                # Scan for devices
-                self._discovered_devices = await self._discovery.scan_for_devices(timeout)
-
-                await self._coordinator.async_shutdown()
-
-                if self._discovered_devices:
-                    return await self.async_step_select_new_devices()
-                return self.async_show_form(
-                    step_id="rediscover",
-                    data_schema=self._get_rediscover_schema(),
-                    errors={"base": ERROR_NO_DEVICES_FOUND}
+                await self._async_run_discovery(
+                    self.config_entry.data[CONF_HOST],
+                    self.config_entry.data[CONF_PORT],
+                    self.config_entry.data.get(CONF_USE_DEVICE_MAPPING, True),
+                    timeout,
                 )
-
             except (OSError, ConnectionError) as e:
                 _LOGGER.error("Error during rediscovery: %s", e)
-                if self._coordinator:
-                    await self._coordinator.async_shutdown()
                 return self.async_show_form(
                     step_id="rediscover",
-                    data_schema=self._get_rediscover_schema(),
+                    data_schema=_REDISCOVER_SCHEMA,
                     errors={"base": ERROR_CANNOT_CONNECT}
                 )
 
+            # Only offer devices that are not configured yet
+            existing_addresses = {
+                d["device_address"] for d in self.config_entry.data.get(CONF_DEVICES, [])
+            }
+            self._device_options = _build_device_options([
+                d for d in self._discovered_devices
+                if d.address not in existing_addresses
+            ])
+
+            if self._discovered_devices:
+                return await self.async_step_select_new_devices()
+            return self.async_show_form(
+                step_id="rediscover",
+                data_schema=_REDISCOVER_SCHEMA,
+                errors={"base": ERROR_NO_DEVICES_FOUND}
+            )
+
         return self.async_show_form(
             step_id="rediscover",
-            data_schema=self._get_rediscover_schema(),
+            data_schema=_REDISCOVER_SCHEMA,
         )
 
-    def _get_rediscover_schema(self):
-        """Get rediscovery schema."""
-        return vol.Schema({
-            vol.Optional("timeout", default=DEFAULT_DISCOVERY_TIMEOUT): vol.All(
-                cv.positive_int, vol.Range(min=10, max=120)
-            ),
-        })
-
     async def async_step_select_new_devices(self, user_input: dict[str, Any] | None = None):
         """Handle selection of newly discovered devices."""
         if user_input is not None:
@@ -362,50 +438,31 @@ class CurtainControlOptionsFlow(config_entries.OptionsFlow):
             if selected_devices:
                 # Get existing devices
                 existing_devices = list(self.config_entry.data.get(CONF_DEVICES, []))
-                existing_addresses = {d["device_address"] for d in existing_devices}
+                existing_by_address = {d["device_address"]: d for d in existing_devices}
 
                 # Add new devices
                 for device_addr_str in selected_devices:
                     device_addr = int(device_addr_str, 16)
-                    if device_addr not in existing_addresses:
-                        device = next(
-                            (d for d in self._discovered_devices if d.address == device_addr),
-                            None
-                        )
+                    if device_addr not in existing_by_address:
+                        device = self._devices_by_address.get(device_addr)
                         if device:
                             existing_devices.append(self._discovery.create_device_config(device))
 
                 # Update config entry
-                new_data = {**self.config_entry.data, CONF_DEVICES: existing_devices}
+                new_data = dict(self.config_entry.data, **{CONF_DEVICES: existing_devices})
                 self.hass.config_entries.async_update_entry(self.config_entry, data=new_data)
 
                 return self.async_create_entry(title="", data={})
 
-        # Filter out already configured devices
-        existing_addresses = {
-            d["device_address"] for d in self.config_entry.data.get(CONF_DEVICES, [])
-        }
-        new_devices = [
-            d for d in self._discovered_devices
-            if d.address not in existing_addresses
-        ]
-
-        if not new_devices:
+        if not self._device_options:
             return self.async_show_form(
                 step_id="select_new_devices",
                 data_schema=vol.Schema({}),
                 errors={"base": "no_new_devices_found"}
             )
 
-        # Create options for new devices only
-        device_options = {}
-        for device in new_devices:
-            key = f"{device.address:04X}"
-            label = f"{device.name} (0x{device.address:04X}) - 位置: {device.last_position}%"
-            device_options[key] = label
-
         schema = vol.Schema({
-            vol.Optional("selected_devices", default=list(device_options.keys())): cv.multi_select(device_options),
+            vol.Optional("selected_devices", default=list(self._device_options)): cv.multi_select(self._device_options),
         })
 
         return self.async_show_form(
@@ -1,34 +1,47 @@
 """Constants for Curtain Control integration."""
 
-DOMAIN = "curtain_control"
+from typing import Final
+
+DOMAIN: Final = "curtain_control"
 
 # Configuration keys
-CONF_HOST = "host"
-CONF_PORT = "port"
-CONF_NAME = "name"
-CONF_DEVICE_ADDRESS = "device_address"
-CONF_DEVICES = "devices"
-CONF_AUTO_DISCOVERY = "auto_discovery"
-CONF_DISCOVERY_TIMEOUT = "discovery_timeout"
-CONF_USE_DEVICE_MAPPING = "use_device_mapping"
-CONF_ENABLE_POLLING = "enable_polling"
-CONF_POLLING_INTERVAL = "polling_interval"
+CONF_HOST: Final[str] = "host"
+CONF_PORT: Final[str] = "port"
+CONF_NAME: Final[str] = "name"
+CONF_DEVICE_ADDRESS: Final[str] = "device_address"
+CONF_DEVICES: Final[str] = "devices"
+CONF_AUTO_DISCOVERY: Final[str] = "auto_discovery"
+CONF_DISCOVERY_TIMEOUT: Final[str] = "discovery_timeout"
+CONF_USE_DEVICE_MAPPING: Final[str] = "use_device_mapping"
+CONF_ENABLE_POLLING: Final[str] = "enable_polling"
+CONF_POLLING_INTERVAL: Final[str] = "polling_interval"
+CONF_POLLING_INTERVAL_MAX: Final[str] = "polling_interval_max"
 
 # Default values
-DEFAULT_NAME = "Curtain"
-DEFAULT_PORT = 32
-DEFAULT_DISCOVERY_TIMEOUT = 30
-DEFAULT_POLLING_INTERVAL = 5
+DEFAULT_NAME: Final = "Curtain"
+DEFAULT_PORT: Final = 32
+DEFAULT_DISCOVERY_TIMEOUT: Final = 30
+DEFAULT_POLLING_INTERVAL: Final = 5
+DEFAULT_POLLING_INTERVAL_MAX: Final = 60
+
+# Adaptive polling
+POLLING_BACKOFF_FACTOR: Final = 1.5  # Interval growth per poll without position changes
+POLLING_BOOST_DURATION: Final = 30  # Seconds of fast polling after a command
+
+# Controller device info
+DEVICE_NAME: Final = "Duya窗帘控制器"
+DEVICE_MANUFACTURER: Final = "Duya"
+DEVICE_MODEL: Final = "智能窗帘控制器"
+DEVICE_SW_VERSION: Final = "1.0"
 
 # Data keys
-DATA_COORDINATOR = "coordinator"
-DATA_DISCOVERY = "discovery"
+DATA_DISCOVERY: Final[str] = "discovery"
 
 # Discovery steps
-STEP_DISCOVERY = "discovery"
-STEP_DEVICE_SELECTION = "device_selection"
+STEP_DISCOVERY: Final = "discovery"
+STEP_DEVICE_SELECTION: Final = "device_selection"
 
 # Error codes
-ERROR_CANNOT_CONNECT = "cannot_connect"
-ERROR_NO_DEVICES_FOUND = "no_devices_found"
-ERROR_DEVICE_NOT_RESPONDING = "device_not_responding"
+ERROR_CANNOT_CONNECT: Final = "cannot_connect"
+ERROR_NO_DEVICES_FOUND: Final = "no_devices_found"
+ERROR_DEVICE_NOT_RESPONDING: Final = "device_not_responding"
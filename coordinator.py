@@ -1,59 +1,91 @@
 """TCP Coordinator for Curtain Control integration."""
 
+import array
 import asyncio
 from collections.abc import Callable
 import contextlib
+from functools import lru_cache
 import logging
 import struct
 from typing import Any
+import weakref
 
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
-from .const import DOMAIN
+from .const import DOMAIN, POLLING_BACKOFF_FACTOR, POLLING_BOOST_DURATION
 
 _LOGGER = logging.getLogger(__name__)
 
 
-def calculate_crc(command: bytes) -> int:
-    """Calculate CRC for the command."""
-    crc = 0xFFFF
-    for byte in command:
-        crc ^= byte
+def _build_crc16_modbus_table() -> array.array:
+    """Build the 256-entry lookup table for CRC-16/MODBUS (polynomial 0xA001)."""
+    table = array.array('H')
+    for byte in range(256):
+        crc = byte
         for _ in range(8):
             if crc & 0x0001:
                 crc = (crc >> 1) ^ 0xA001
             else:
                 crc >>= 1
+        table.append(crc)
+    return table
+
+
+_CRC16_MODBUS_TABLE = _build_crc16_modbus_table()
+
+
+def calculate_crc(command: bytes | bytearray | memoryview) -> int:
+    """Calculate CRC for the command."""
+    table = _CRC16_MODBUS_TABLE  # Local lookup inside the per-byte loop
+    crc = 0xFFFF
+    for byte in command:
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
     return crc
 
 
-def bytes_to_hex(byte_string: bytes) -> str:
+def bytes_to_hex(byte_string: bytes | bytearray | memoryview) -> str:
     """Convert bytes to hex string."""
-    return ' '.join([f'{b:02X}' for b in byte_string])
+    return byte_string.hex(' ').upper()
+
+
+# Corrected value for every single-byte position reported on the bus
+_POS_CORRECTION: tuple[int, ...] = tuple(
+    100 if 97 <= p <= 100 else 0 if p <= 3 else p for p in range(256)
+)
 
 
 def correct_position(position: int) -> int:
     """修正位置数据，处理硬件限位器不精确的问题.
 
     Args:
-        position: 原始位置值 (0-100)
+        position: 原始位置值 (单字节 0-255，正常为 0-100)
 
     Returns:
         修正后的位置值
     """
-    if 97 <= position <= 100:
-        return 100
-    if 0 <= position <= 3:
-        return 0
-    return position
+    return _POS_CORRECTION[position]
+
+
+@lru_cache(maxsize=256)
+def _prefix_crc(device_address: int, function_code: int) -> int:
+    """Return the CRC state after the fixed 4-byte command header for a device/function."""
+    return calculate_crc(struct.pack('>BHB', 0x55, device_address, function_code))
 
 
+@lru_cache(maxsize=1024)
 def generate_command(device_address: int, function_code: int, data_address: int, data: int) -> bytes:
     """Generate command for the curtain control."""
-    command = struct.pack('>BHB', 0x55, device_address, function_code) + struct.pack('>B', data_address) + struct.pack('>B', data)
-    crc = calculate_crc(command)
-    return command + struct.pack('<H', crc)
+    # Fold the two variable bytes into the cached header CRC
+    crc = _prefix_crc(device_address, function_code)
+    crc = (crc >> 8) ^ _CRC16_MODBUS_TABLE[(crc ^ data_address) & 0xFF]
+    crc = (crc >> 8) ^ _CRC16_MODBUS_TABLE[(crc ^ data) & 0xFF]
+
+    # CRC goes out little-endian, so byte-swap it for the big-endian pack
+    return struct.pack(
+        '>BHBBBH', 0x55, device_address, function_code, data_address, data,
+        ((crc & 0xFF) << 8) | (crc >> 8),
+    )
 
 
 def generate_query_position_command(device_address: int) -> bytes:
@@ -73,15 +105,39 @@ def generate_query_position_command(device_address: int) -> bytes:
     POSITION_DATA_ADDRESS = 0x02  # 位置数据地址，固定
     POSITION_DATA_LENGTH = 0x01   # 数据长度，固定
     
-    command = struct.pack('>BHB', 0x55, device_address, 0x01) + struct.pack('>BB', POSITION_DATA_ADDRESS, POSITION_DATA_LENGTH)
-    crc = calculate_crc(command)
-    return command + struct.pack('<H', crc)
+    return generate_command(device_address, 0x01, POSITION_DATA_ADDRESS, POSITION_DATA_LENGTH)
+
+
+class _CurtainProtocol(asyncio.Protocol):
+    """Feed bytes from the TCP server straight into the coordinator's packet parser."""
+
+    def __init__(self, coordinator: "CurtainTCPCoordinator") -> None:
+        """Initialize the protocol."""
+        self._coordinator = coordinator
+        self.closed: asyncio.Future[Exception | None] = asyncio.get_running_loop().create_future()
+
+    def data_received(self, data: bytes) -> None:
+        """Handle data received from the TCP server."""
+        self._coordinator._handle_received_data(data)
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        """Signal that the connection has been closed."""
+        if not self.closed.done():
+            self.closed.set_result(exc)
 
 
 class CurtainTCPCoordinator(DataUpdateCoordinator):
     """Coordinator for managing TCP connection and device communication."""
 
-    def __init__(self, hass: HomeAssistant, host: str, port: int, enable_polling: bool = False, polling_interval: int = 5):
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        host: str,
+        port: int,
+        enable_polling: bool = False,
+        polling_interval: int = 5,
+        max_polling_interval: int | None = None,
+    ):
         """Initialize the coordinator."""
         super().__init__(
             hass,
@@ -94,22 +150,32 @@ class CurtainTCPCoordinator(DataUpdateCoordinator):
         self._port = port
 
         # Device management
-        self._devices: dict[int, Any] = {}  # device_address -> entity
+        # device_address -> entity; weak so entities dropped on reload are not kept alive
+        self._devices: weakref.WeakValueDictionary[int, Any] = weakref.WeakValueDictionary()
         self._device_positions: dict[int, int | None] = {}  # device_address -> position
+        self._last_packet: dict[int, bytes] = {}  # device_address -> last valid frame
 
         # TCP connection
-        self._reader: asyncio.StreamReader | None = None
-        self._writer: asyncio.StreamWriter | None = None
+        self._transport: asyncio.Transport | None = None
+        self._protocol: _CurtainProtocol | None = None
         self._listen_task: asyncio.Task | None = None
+        self._rx_buffer = bytearray()  # Received bytes not yet parsed into packets
         self._command_lock = asyncio.Lock()
+        self._connect_lock = asyncio.Lock()  # Listen loop and send path may both reconnect
 
         # Discovery
-        self._discovered_devices: list[int] = []
-        self._discovery_callbacks: list[Callable] = []
+        self._discovered_devices: set[int] = set()
+        self._discovery_callbacks: set[Callable[[int], None]] = set()
         
-        # Polling
+        # Polling (interval adapts between polling_interval and max_polling_interval)
         self._enable_polling = enable_polling
         self._polling_interval = polling_interval
+        self._max_polling_interval = max(max_polling_interval or polling_interval, polling_interval)
+        self._current_polling_interval: float = polling_interval
+        self._unchanged_polls = 0
+        self._positions_changed = False
+        self._fast_polling_until = 0.0
+        self._polling_wakeup = asyncio.Event()
         self._polling_task: asyncio.Task | None = None
 
     @property
@@ -125,12 +191,17 @@ class CurtainTCPCoordinator(DataUpdateCoordinator):
     @property
     def discovered_devices(self) -> list[int]:
         """Return list of discovered device addresses."""
-        return self._discovered_devices.copy()
+        return sorted(self._discovered_devices)
+
+    @property
+    def registered_devices(self) -> set[int]:
+        """Return addresses of devices with a registered entity."""
+        return set(self._devices)
 
     @property
     def is_connected(self) -> bool:
         """Return if coordinator is connected."""
-        return self._writer is not None
+        return self._transport is not None
 
     async def test_connection(self) -> bool:
         """Test if connection can be established."""
@@ -161,27 +232,40 @@ class CurtainTCPCoordinator(DataUpdateCoordinator):
             with contextlib.suppress(asyncio.CancelledError):
                 await self._listen_task
 
+        await self.stop_polling()
         await self._async_disconnect()
 
     async def _async_connect(self) -> bool:
-        """Establish TCP connection."""
-        try:
-            _LOGGER.info("Connecting to TCP server %s:%d", self._host, self._port)
-            self._reader, self._writer = await asyncio.open_connection(self._host, self._port)
-            _LOGGER.info("✅ Successfully connected to TCP server")
-        except (OSError, ConnectionError) as e:
-            _LOGGER.error("Failed to connect to TCP server: %s", e)
-            return False
-        else:
-            return True
+        """Establish TCP connection, replacing any stale one."""
+        async with self._connect_lock:
+            if self._transport and not self._transport.is_closing():
+                # Already reconnected by another caller
+                return True
+
+            # Close the old transport so it cannot keep feeding the receive buffer
+            await self._async_disconnect()
+
+            try:
+                _LOGGER.info("Connecting to TCP server %s:%d", self._host, self._port)
+                self._transport, self._protocol = await self.hass.loop.create_connection(
+                    lambda: _CurtainProtocol(self), self._host, self._port
+                )
+                _LOGGER.info("✅ Successfully connected to TCP server")
+            except (OSError, ConnectionError) as e:
+                _LOGGER.error("Failed to connect to TCP server: %s", e)
+                return False
+            else:
+                return True
 
     async def _async_disconnect(self):
         """Disconnect from TCP server."""
-        if self._writer:
-            self._writer.close()
-            await self._writer.wait_closed()
-            self._writer = None
-            self._reader = None
+        if self._transport:
+            transport, protocol = self._transport, self._protocol
+            self._transport = None
+            self._protocol = None
+            transport.close()
+            await asyncio.shield(protocol.closed)
+            self._rx_buffer = bytearray()
             _LOGGER.info("Disconnected from TCP server")
 
     async def _async_listen_loop(self):
@@ -191,88 +275,121 @@ class CurtainTCPCoordinator(DataUpdateCoordinator):
         while True:
             try:
                 # Ensure connection
-                if not self._reader or not self._writer:
+                if not self._transport:
                     if not await self._async_connect():
                         _LOGGER.info("Waiting 5 seconds before retry...")
                         await asyncio.sleep(5)
                         continue
 
-                # Read data
-                data = await self._reader.read(1024)
-                if not data:
+                # Packets are handled by the protocol; wait until the connection drops
+                protocol = self._protocol
+                await asyncio.shield(protocol.closed)
+                if protocol is self._protocol:
                     _LOGGER.warning("TCP connection closed, reconnecting...")
                     await self._async_disconnect()
-                    continue
-
-                _LOGGER.debug("Received TCP data: %s", bytes_to_hex(data))
-
-                # Parse multiple packets
-                self._parse_multiple_packets(data)
 
             except asyncio.CancelledError:
                 _LOGGER.info("TCP listening loop cancelled")
                 break
-            except (OSError, ConnectionError, struct.error, ValueError) as e:
+            except (OSError, ConnectionError) as e:
                 _LOGGER.error("Error in TCP listening loop: %s", e)
                 await self._async_disconnect()
                 await asyncio.sleep(5)
 
-    def _parse_multiple_packets(self, data: bytes):
-        """Parse multiple packets from TCP stream."""
-        offset = 0
-        while offset < len(data):
-            # Find packet start marker 0x55
-            start_idx = data.find(0x55, offset)
-            if start_idx == -1:
-                break
+    def _handle_received_data(self, data: bytes) -> None:
+        """Parse packets from data received on the TCP connection."""
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug("Received TCP data: %s", bytes_to_hex(data))
 
-            # Check if we have enough data for a complete packet
-            if start_idx + 8 > len(data):
-                _LOGGER.debug("Incomplete packet, waiting for more data")
-                break
+        # Parse complete packets, keeping any partial packet for the next read
+        self._rx_buffer.extend(data)
+        try:
+            consumed = self._parse_multiple_packets(self._rx_buffer)
+        except (struct.error, ValueError) as e:
+            _LOGGER.error("Error parsing TCP data: %s", e)
+            self._rx_buffer = bytearray()
+            return
+        del self._rx_buffer[:consumed]
 
-            # Extract single packet (8 bytes)
-            packet = data[start_idx:start_idx + 8]
-            _LOGGER.debug("Processing packet: %s", bytes_to_hex(packet))
-            self._parse_status_packet(packet)
+    def _parse_multiple_packets(self, data: bytes | bytearray) -> int:
+        """Parse multiple packets from TCP stream, returning the number of bytes consumed."""
+        offset = 0
+        resyncing = False
+        # Packets are parsed in place through a view; it is released on return so
+        # the caller can trim the consumed bytes from its buffer
+        with memoryview(data) as mv:
+            while offset < len(data):
+                # Find packet start marker 0x55
+                start_idx = data.find(0x55, offset)
+                if start_idx == -1:
+                    # No packet start left, drop the remaining bytes
+                    return len(data)
+
+                # Check if we have enough data for a complete packet
+                if start_idx + 8 > len(data):
+                    _LOGGER.debug("Incomplete packet, waiting for more data")
+                    return start_idx
+
+                # Parse single packet (8 bytes) without copying it
+                if _LOGGER.isEnabledFor(logging.DEBUG):
+                    _LOGGER.debug("Processing packet: %s", bytes_to_hex(mv[start_idx:start_idx + 8]))
+                if self._parse_status_packet(mv, start_idx):
+                    offset = start_idx + 8
+                    resyncing = False
+                else:
+                    # Stray 0x55 (noise or a cut-off frame): resync on the next byte,
+                    # reporting the run once rather than every candidate start
+                    if not resyncing:
+                        _LOGGER.error("Invalid packet %s, resyncing on next start marker",
+                                      bytes_to_hex(mv[start_idx:start_idx + 8]))
+                        resyncing = True
+                    offset = start_idx + 1
+
+        return offset
+
+    def _parse_status_packet(self, data: bytes | bytearray | memoryview, offset: int = 0) -> bool:
+        """Parse the status packet starting at offset and update device state.
+
+        Returns True if a valid frame starts at offset.
+        """
+        if len(data) - offset < 8:
+            return False
 
-            offset = start_idx + 8
+        # Header: start marker, device address (big endian), function, data address, position
+        marker, device_address, function_code, data_address, position = struct.unpack_from(
+            '>BHBBB', data, offset
+        )
+        if marker != 0x55:
+            return False
 
-    def _parse_status_packet(self, data: bytes):
-        """Parse status packet and update device state."""
-        if len(data) < 8:
-            return
-        if data[0] != 0x55:
-            return
+        # Identical to the last valid frame from this device: already handled
+        frame = bytes(data[offset:offset + 8])
+        if self._last_packet.get(device_address) == frame:
+            return True
 
-        # Parse device address (bytes 1-2, big endian)
-        device_address = struct.unpack('>H', data[1:3])[0]
-        function_code = data[3]
-        data_address = data[4]
-        position = data[5]
+        # Verify CRC over the same header bytes before using any parsed field
+        crc_received = struct.unpack_from('<H', data, offset + 6)[0]
+        if calculate_crc(memoryview(data)[offset:offset + 6]) != crc_received:
+            _LOGGER.debug("CRC mismatch for device 0x%04X", device_address)
+            return False
+        self._last_packet[device_address] = frame
 
         _LOGGER.debug("Parsed packet: device=0x%04X, func=0x%02X, addr=0x%02X, pos=%d",
                      device_address, function_code, data_address, position)
 
-        # Verify CRC
-        crc_received = struct.unpack('<H', data[6:8])[0]
-        crc_calculated = calculate_crc(data[:6])
-
-        if crc_received != crc_calculated:
-            _LOGGER.error("CRC mismatch for device 0x%04X", device_address)
-            return
-
         # Update device discovery
         if device_address not in self._discovered_devices:
-            self._discovered_devices.append(device_address)
+            self._discovered_devices.add(device_address)
             _LOGGER.info("🔍 Discovered new device: 0x%04X", device_address)
 
             # Notify discovery callbacks
-            for callback in self._discovery_callbacks:
-                try:
-                    callback(device_address)
-                except (TypeError, ValueError, AttributeError) as e:
-                    _LOGGER.error("Error in discovery callback: %s", e)
+            if self._discovery_callbacks:
+                # Copy so a callback may unregister itself while being notified
+                for callback in tuple(self._discovery_callbacks):
+                    try:
+                        callback(device_address)
+                    except Exception as e:
+                        _LOGGER.error("Error in discovery callback: %s", e)
 
         # Update device position if this is a status response
         if function_code == 0x01 and data_address == 0x01:
@@ -282,7 +399,16 @@ class CurtainTCPCoordinator(DataUpdateCoordinator):
             raw_position = position
             corrected_position = correct_position(position)
 
+            # Repeated status with no change: skip logging and entity updates
+            entity = self._devices.get(device_address)
+            if corrected_position == old_position and (
+                entity is None or entity.current_cover_position == corrected_position
+            ):
+                return True
+
             self._device_positions[device_address] = corrected_position
+            if corrected_position != old_position:
+                self._positions_changed = True
 
             if raw_position != corrected_position:
                 _LOGGER.info("📍 Device 0x%04X position update: %s -> %d (raw: %d, corrected: %d)",
@@ -292,16 +418,19 @@ class CurtainTCPCoordinator(DataUpdateCoordinator):
                             device_address, old_position, corrected_position)
 
             # Notify registered device entity
-            if device_address in self._devices:
-                entity = self._devices[device_address]
-                if hasattr(entity, 'async_update_position'):
-                    self.hass.async_create_task(
-                        entity.async_update_position(corrected_position)
-                    )
+            if entity is not None and hasattr(entity, 'async_update_position'):
+                self.hass.async_create_task(
+                    entity.async_update_position(corrected_position)
+                )
+
+        return True
 
     async def send_command(self, device_address: int, function_code: int, data_address: int, data: int) -> bool:
         """Send command to specific device."""
         command = generate_command(device_address, function_code, data_address, data)
+        # Entity state is set optimistically, so the next report must not be skipped
+        self._last_packet.pop(device_address, None)
+        self._boost_polling()
         return await self._send_raw_command(command)
 
     async def _send_raw_command(self, command: bytes) -> bool:
@@ -309,15 +438,15 @@ class CurtainTCPCoordinator(DataUpdateCoordinator):
         async with self._command_lock:
             try:
                 # Ensure connection
-                if not self._writer:
+                if not self._transport or self._transport.is_closing():
                     if not await self._async_connect():
                         return False
 
                 # Send command
-                self._writer.write(command)
-                await self._writer.drain()
+                self._transport.write(command)
 
-                _LOGGER.info("📤 Sent command: %s", bytes_to_hex(command))
+                if _LOGGER.isEnabledFor(logging.INFO):
+                    _LOGGER.info("📤 Sent command: %s", bytes_to_hex(command))
 
             except (OSError, ConnectionError) as e:
                 _LOGGER.error("Failed to send command: %s", e)
@@ -343,12 +472,11 @@ class CurtainTCPCoordinator(DataUpdateCoordinator):
 
     def add_discovery_callback(self, callback: Callable[[int], None]):
         """Add a callback for device discovery."""
-        self._discovery_callbacks.append(callback)
+        self._discovery_callbacks.add(callback)
 
     def remove_discovery_callback(self, callback: Callable[[int], None]):
         """Remove a discovery callback."""
-        if callback in self._discovery_callbacks:
-            self._discovery_callbacks.remove(callback)
+        self._discovery_callbacks.discard(callback)
 
     async def async_discover_devices(self, timeout: int = 30) -> list[int]:
         """Discover devices by listening for a specified time."""
@@ -356,27 +484,29 @@ class CurtainTCPCoordinator(DataUpdateCoordinator):
 
         initial_devices = set(self._discovered_devices)
         await asyncio.sleep(timeout)
-        new_devices = set(self._discovered_devices) - initial_devices
+        new_devices = self._discovered_devices - initial_devices
 
         _LOGGER.info("Discovery complete. Found %d new devices: %s",
                     len(new_devices),
                     [f"0x{addr:04X}" for addr in new_devices])
 
-        return self._discovered_devices.copy()
+        return sorted(self._discovered_devices)
 
     async def _polling_task_loop(self):
         """轮询任务循环，定期查询设备位置."""
-        _LOGGER.info("🔄 轮询任务已启动，间隔: %d秒", self._polling_interval)
+        _LOGGER.info("🔄 轮询任务已启动，间隔: %d-%d秒",
+                     self._polling_interval, self._max_polling_interval)
         
         while self._polling_task and not self._polling_task.cancelled():
             try:
                 # 为每个已注册的设备发送查询位置命令
-                for device_address in self._devices.keys():
+                for device_address in list(self._devices):
                     try:
                         query_command = generate_query_position_command(device_address)
                         await self._send_raw_command(query_command)
-                        _LOGGER.debug("📤 发送轮询命令到设备 0x%04X: %s", 
-                                    device_address, bytes_to_hex(query_command))
+                        if _LOGGER.isEnabledFor(logging.DEBUG):
+                            _LOGGER.debug("📤 发送轮询命令到设备 0x%04X: %s",
+                                          device_address, bytes_to_hex(query_command))
                         
                         # 在设备之间添加小延迟，避免命令冲突
                         await asyncio.sleep(0.1)
@@ -384,8 +514,14 @@ class CurtainTCPCoordinator(DataUpdateCoordinator):
                     except Exception as e:
                         _LOGGER.error("❌ 轮询设备 0x%04X 时出错: %s", device_address, e)
                 
-                # 等待下次轮询
-                await asyncio.sleep(self._polling_interval)
+                # 等待下次轮询（命令发送后会提前唤醒）
+                self._polling_wakeup.clear()
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(
+                        self._polling_wakeup.wait(), self._next_polling_interval()
+                    )
+                    # 被命令唤醒：同样间隔一下再查询，避免紧跟用户命令造成总线冲突
+                    await asyncio.sleep(0.1)
                 
             except asyncio.CancelledError:
                 _LOGGER.info("🛑 轮询任务已取消")
@@ -394,6 +530,31 @@ class CurtainTCPCoordinator(DataUpdateCoordinator):
                 _LOGGER.error("❌ 轮询任务出错: %s", e)
                 await asyncio.sleep(self._polling_interval)
 
+    def _next_polling_interval(self) -> float:
+        """计算下次轮询间隔：位置无变化时逐步退避，有变化或刚发送命令时恢复快速轮询."""
+        if self._positions_changed or self.hass.loop.time() < self._fast_polling_until:
+            self._unchanged_polls = 0
+            self._current_polling_interval = self._polling_interval
+        else:
+            self._unchanged_polls += 1
+            self._current_polling_interval = min(
+                self._current_polling_interval * POLLING_BACKOFF_FACTOR,
+                self._max_polling_interval,
+            )
+        self._positions_changed = False
+
+        _LOGGER.debug("下次轮询间隔: %.1f秒 (连续 %d 次无变化)",
+                      self._current_polling_interval, self._unchanged_polls)
+        return self._current_polling_interval
+
+    def _boost_polling(self) -> None:
+        """发送命令后窗帘可能移动，在一段时间内恢复快速轮询并立即唤醒轮询任务."""
+        if not self._enable_polling:
+            return
+        self._fast_polling_until = self.hass.loop.time() + POLLING_BOOST_DURATION
+        self._current_polling_interval = self._polling_interval
+        self._polling_wakeup.set()
+
     async def start_polling(self):
         """启动轮询任务."""
         if not self._enable_polling:
@@ -417,3 +578,17 @@ class CurtainTCPCoordinator(DataUpdateCoordinator):
             except asyncio.CancelledError:
                 pass
             self._polling_task = None
+
+    async def async_update_polling(
+        self, enable_polling: bool, polling_interval: int, max_polling_interval: int | None = None
+    ) -> None:
+        """更新轮询设置，无需重新建立TCP连接."""
+        await self.stop_polling()
+
+        self._enable_polling = enable_polling
+        self._polling_interval = polling_interval
+        self._max_polling_interval = max(max_polling_interval or polling_interval, polling_interval)
+        self._current_polling_interval = polling_interval
+        self._unchanged_polls = 0
+
+        await self.start_polling()
@@ -19,9 +19,12 @@ from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
 
 from .const import (
     CONF_DEVICE_ADDRESS,
-    DATA_COORDINATOR,
     DEFAULT_NAME,
     DEFAULT_PORT,
+    DEVICE_MANUFACTURER,
+    DEVICE_MODEL,
+    DEVICE_NAME,
+    DEVICE_SW_VERSION,
     DOMAIN,
 )
 from .coordinator import CurtainTCPCoordinator
@@ -50,18 +53,19 @@ async def async_setup_platform(
 
     # Create coordinator if it doesn't exist
     coordinator_key = f"{host}:{port}"
-    if coordinator_key not in hass.data.setdefault(DATA_COORDINATOR, {}):
+    coordinators = hass.data.setdefault(DOMAIN, {})
+    if coordinator_key not in coordinators:
         coordinator = CurtainTCPCoordinator(hass, host, port)
         await coordinator.async_setup()
-        hass.data[DATA_COORDINATOR][coordinator_key] = coordinator
+        coordinators[coordinator_key] = coordinator
 
-    coordinator = hass.data[DATA_COORDINATOR][coordinator_key]
+    coordinator = coordinators[coordinator_key]
     async_add_entities([CurtainControl(coordinator, device_address, name)])
 
 
 async def async_setup_entry(hass, entry, async_add_entities):
     """Set up curtain control from a config entry."""
-    coordinator = hass.data[DATA_COORDINATOR][entry.entry_id]
+    coordinator = entry.runtime_data
 
     # Get devices from entry data
     devices = entry.data.get("devices", [])
@@ -75,17 +79,6 @@ async def async_setup_entry(hass, entry, async_add_entities):
     async_add_entities(entities)
 
 
-async def async_unload_entry(hass, entry):
-    """Unload a config entry."""
-    coordinator = hass.data[DATA_COORDINATOR].get(entry.entry_id)
-    if coordinator:
-        await coordinator.async_shutdown()
-        del hass.data[DATA_COORDINATOR][entry.entry_id]
-
-    _LOGGER.info("Unloaded curtain control config entry")
-    return True
-
-
 class CurtainControl(CoverEntity):
     """Representation of a curtain control using coordinator."""
 
@@ -96,6 +89,9 @@ class CurtainControl(CoverEntity):
         self._name = name
         self._position: int | None = None
         self._attr_is_closed: bool | None = None
+        self._device_address_str = f"0x{device_address:04X}"
+        self._cached_attrs: dict[str, Any] | None = None
+        self._cached_attrs_connected: bool | None = None
 
         # Register with coordinator
         self._coordinator.register_device(self._device_address, self)
@@ -115,11 +111,10 @@ class CurtainControl(CoverEntity):
         """Return device information about this curtain controller."""
         return DeviceInfo(
             identifiers={(DOMAIN, f"{self._coordinator.host}_{self._coordinator.port}")},
-            name="Duya窗帘控制器",
-            manufacturer="Duya",
-            model="智能窗帘控制器",
-            sw_version="1.0",
-            connections={("tcp", f"{self._coordinator.host}:{self._coordinator.port}")},
+            name=DEVICE_NAME,
+            manufacturer=DEVICE_MANUFACTURER,
+            model=DEVICE_MODEL,
+            sw_version=DEVICE_SW_VERSION,
         )
 
     @property
@@ -154,26 +149,31 @@ class CurtainControl(CoverEntity):
         """Return the icon to use in the frontend."""
         if self._position is None:
             return "mdi:curtains"
-        if self._position == 0:
-            return "mdi:curtains-closed"           # 完全关闭
-        if self._position == 100:
-            return "mdi:curtains"                  # 完全打开
         if self._position < 25:
-            return "mdi:curtains-closed"           # 大部分关闭
-        if self._position < 75:
-            return "mdi:curtains"                  # 中等位置，部分打开
-        return "mdi:curtains"                      # 大部分打开
+            return "mdi:curtains-closed"           # 完全或大部分关闭
+        return "mdi:curtains"                      # 部分或完全打开
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return the state attributes."""
-        return {
-            "position_percentage": self._position,
-            "status": self._get_status_text(),
-            "device_address": f"0x{self._device_address:04X}",
-            "coordinator_status": "已连接" if self._coordinator.is_connected else "未连接",
-            "protocol": "TCP"
-        }
+        # Rebuilt only after a position or connection status change
+        connected = self._coordinator.is_connected
+        if self._cached_attrs is None or self._cached_attrs_connected is not connected:
+            self._cached_attrs = {
+                "position_percentage": self._position,
+                "status": self._get_status_text(),
+                "device_address": self._device_address_str,
+                "coordinator_status": "已连接" if connected else "未连接",
+                "protocol": "TCP"
+            }
+            self._cached_attrs_connected = connected
+        return self._cached_attrs
+
+    def _set_position(self, position: int | None) -> None:
+        """Update the position and derived state."""
+        self._position = position
+        self._attr_is_closed = None if position is None else position == 0
+        self._cached_attrs = None
 
     def _get_status_text(self) -> str:
         """Get human readable status text."""
@@ -190,9 +190,7 @@ class CurtainControl(CoverEntity):
         _LOGGER.info("窗帘控制实体已添加: %s (0x%04X)", self._name, self._device_address)
 
         # Get initial position from coordinator
-        self._position = self._coordinator.get_device_position(self._device_address)
-        if self._position is not None:
-            self._attr_is_closed = self._position == 0
+        self._set_position(self._coordinator.get_device_position(self._device_address))
 
     async def async_will_remove_from_hass(self) -> None:
         """Call when entity will be removed from hass."""
@@ -202,8 +200,7 @@ class CurtainControl(CoverEntity):
     async def async_update_position(self, position: int) -> None:
         """Update position from coordinator callback."""
         old_position = self._position
-        self._position = position
-        self._attr_is_closed = position == 0
+        self._set_position(position)
 
         _LOGGER.debug("位置更新: %s (0x%04X) %s -> %d%%",
                      self._name, self._device_address, old_position, position)
@@ -221,8 +218,7 @@ class CurtainControl(CoverEntity):
 
         if success:
             # Optimistically update state
-            self._position = 100
-            self._attr_is_closed = False
+            self._set_position(100)
             self.async_write_ha_state()
         else:
             _LOGGER.error("Failed to send open command to %s", self._name)
@@ -237,8 +233,7 @@ class CurtainControl(CoverEntity):
 
         if success:
             # Optimistically update state
-            self._position = 0
-            self._attr_is_closed = True
+            self._set_position(0)
             self.async_write_ha_state()
         else:
             _LOGGER.error("Failed to send close command to %s", self._name)
@@ -269,8 +264,7 @@ class CurtainControl(CoverEntity):
 
         if success:
             # Optimistically update state
-            self._position = position
-            self._attr_is_closed = position == 0
+            self._set_position(position)
             self.async_write_ha_state()
         else:
             _LOGGER.error("Failed to send position command to %s", self._name)
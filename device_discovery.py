@@ -1,13 +1,29 @@
 """Device Discovery Service for Curtain Control integration."""
 
 import asyncio
+from collections.abc import Mapping
 import logging
+from types import MappingProxyType
 from typing import NamedTuple
 
 from .coordinator import CurtainTCPCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
+# 真实设备地址映射表
+_DEVICE_NAMES: Mapping[int, str] = MappingProxyType({
+    0x06FE: "主卧室_纱帘",
+    0x05FE: "主卧室_布帘",
+    0x04FE: "客厅_纱帘",
+    0x07FE: "儿童房_布帘",
+    0x08FE: "儿童房_纱帘",
+    0x0AFE: "书房_纱帘",
+    0x09FE: "书房_布帘",
+    0x02FE: "老人房_纱帘",
+    0x01FE: "老人房_布帘",
+    0x03FE: "客厅_布帘",
+})
+
 
 class DiscoveredDevice(NamedTuple):
     """Represents a discovered curtain device."""
@@ -38,29 +54,20 @@ class DeviceDiscovery:
             # 不使用映射表，直接返回设备地址
             return f"窗帘 0x{address:04X}"
 
-        # 真实设备地址映射表
-        device_names = {
-            0x06FE: "主卧室_纱帘",
-            0x05FE: "主卧室_布帘",
-            0x04FE: "客厅_纱帘",
-            0x07FE: "儿童房_布帘",
-            0x08FE: "儿童房_纱帘",
-            0x0AFE: "书房_纱帘",
-            0x09FE: "书房_布帘",
-            0x02FE: "老人房_纱帘",
-            0x01FE: "老人房_布帘",
-            0x03FE: "客厅_布帘",
-        }
+        return _DEVICE_NAMES.get(address, f"窗帘 0x{address:04X}")
 
-        return device_names.get(address, f"窗帘 0x{address:04X}")
+    async def scan_for_devices(self) -> None:
+        """Collect devices until cancelled.
 
-    async def scan_for_devices(self, timeout: int = 30) -> list[DiscoveredDevice]:
-        """Scan for devices for a specified time."""
-        _LOGGER.info("🔍 Starting device discovery scan for %d seconds", timeout)
+        Bound the scan with ``asyncio.timeout()``; devices found so far remain
+        available through ``discovered_devices`` after the timeout fires.
+        """
+        _LOGGER.info("🔍 Starting device discovery scan")
 
         # Clear previous discoveries
         self._devices.clear()
         self._discovery_active = True
+        now = asyncio.get_running_loop().time
 
         # Add callback to capture discovered devices
         def on_device_discovered(address: int):
@@ -70,7 +77,7 @@ class DeviceDiscovery:
                     address=address,
                     name=self.get_device_name(address, self._use_mapping),
                     last_position=position,
-                    last_seen=asyncio.get_event_loop().time()
+                    last_seen=now()
                 )
                 self._devices[address] = device
                 _LOGGER.info("✅ Found device: %s (0x%04X) at position %d%%",
@@ -80,8 +87,12 @@ class DeviceDiscovery:
         self._coordinator.add_discovery_callback(on_device_discovered)
 
         try:
-            # Wait for discovery period
-            await asyncio.sleep(timeout)
+            # Listen until the caller's timeout cancels the scan
+            await asyncio.get_running_loop().create_future()
+
+        finally:
+            self._discovery_active = False
+            self._coordinator.remove_discovery_callback(on_device_discovered)
 
             # Also get any devices that were already known
             for address in self._coordinator.discovered_devices:
@@ -91,20 +102,13 @@ class DeviceDiscovery:
                         address=address,
                         name=self.get_device_name(address, self._use_mapping),
                         last_position=position,
-                        last_seen=asyncio.get_event_loop().time()
+                        last_seen=now()
                     )
                     self._devices[address] = device
 
-        finally:
-            self._discovery_active = False
-            self._coordinator.remove_discovery_callback(on_device_discovered)
-
-        discovered = list(self._devices.values())
-        _LOGGER.info("🎯 Discovery complete! Found %d devices: %s",
-                   len(discovered),
-                   ", ".join([f"{d.name}(0x{d.address:04X})" for d in discovered]))
-
-        return discovered
+            _LOGGER.info("🎯 Discovery complete! Found %d devices: %s",
+                       len(self._devices),
+                       ", ".join([f"{d.name}(0x{d.address:04X})" for d in self._devices.values()]))
 
     async def test_device_communication(self, address: int) -> bool:
         """Test communication with a specific device."""